@@ -11,13 +11,14 @@ class ChatOpenAI:
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if self.openai_api_key is None:
             raise ValueError("OPENAI_API_KEY is not set")
+        # One client per model so calls share its pooled keep-alive connections
+        self.client = OpenAI()
 
     def run(self, messages, text_only: bool = True, **kwargs):
         if not isinstance(messages, list):
             raise ValueError("messages must be a list")
 
-        client = OpenAI()
-        response = client.chat.completions.create(
+        response = self.client.chat.completions.create(
             model=self.model_name, messages=messages, **kwargs
         )
 
@@ -1,5 +1,5 @@
 import re
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
 from abc import ABC, abstractmethod
 
 
@@ -45,12 +45,11 @@ class ConditionalPrompt:
             if missing_vars:
                 raise PromptValidationError(f"Missing required variables: {missing_vars}")
         
-        # Format remaining variables
-        for var in variables:
-            value = merged_kwargs.get(var, "")
-            result = result.replace(f"{{{var}}}", str(value))
-            
-        return result
+        # Format remaining variables in a single pass, so placeholders that
+        # appear inside substituted values are left as-is
+        return self._var_pattern.sub(
+            lambda match: str(merged_kwargs.get(match.group(1), "")), result
+        )
     
     def _process_conditionals(self, text: str, context: Dict[str, Any]) -> str:
         """Process conditional statements in the text"""
@@ -119,6 +118,8 @@ class BasePrompt:
         self.strict = strict
         self.defaults = defaults or {}
         self._pattern = re.compile(r"\{([^}]+)\}")
+        self._parsed_prompt: Optional[str] = None
+        self._variables: Tuple[str, ...] = ()
         self._validate_template()
 
     def _validate_template(self) -> None:
@@ -137,7 +138,7 @@ class BasePrompt:
         :return: The formatted prompt string
         :raises PromptValidationError: If strict mode and required variables are missing
         """
-        variables = self.get_input_variables()
+        variables = self._input_variables()
         merged_kwargs = {**self.defaults, **kwargs}
         
         if self.strict:
@@ -159,7 +160,15 @@ class BasePrompt:
 
         :return: List of input variable names
         """
-        return self._pattern.findall(self.prompt)
+        return list(self._input_variables())
+
+    def _input_variables(self) -> Tuple[str, ...]:
+        # Scan the template once rather than on every format; rescan only if
+        # ``self.prompt`` has been reassigned
+        if self._parsed_prompt is not self.prompt:
+            self._variables = tuple(self._pattern.findall(self.prompt))
+            self._parsed_prompt = self.prompt
+        return self._variables
     
     def validate_inputs(self, **kwargs) -> Dict[str, List[str]]:
         """
@@ -1,4 +1,5 @@
 import os
+from itertools import chain
 from typing import List
 
 
@@ -50,16 +51,12 @@ class CharacterTextSplitter:
         self.chunk_overlap = chunk_overlap
 
     def split(self, text: str) -> List[str]:
-        chunks = []
-        for i in range(0, len(text), self.chunk_size - self.chunk_overlap):
-            chunks.append(text[i : i + self.chunk_size])
-        return chunks
+        chunk_size = self.chunk_size
+        starts = range(0, len(text), chunk_size - self.chunk_overlap)
+        return [text[i : i + chunk_size] for i in starts]
 
     def split_texts(self, texts: List[str]) -> List[str]:
-        chunks = []
-        for text in texts:
-            chunks.extend(self.split(text))
-        return chunks
+        return list(chain.from_iterable(self.split(text) for text in texts))
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 import numpy as np
-from collections import defaultdict
-from typing import List, Tuple, Callable
+from typing import Dict, List, Optional, Tuple, Callable
 from aimakerspace.openai_utils.embedding import EmbeddingModel
 import asyncio
 
@@ -8,18 +7,21 @@ import asyncio
 def cosine_similarity(vector_a: np.array, vector_b: np.array) -> float:
     """Computes the cosine similarity between two vectors."""
     dot_product = np.dot(vector_a, vector_b)
-    norm_a = np.linalg.norm(vector_a)
-    norm_b = np.linalg.norm(vector_b)
-    return dot_product / (norm_a * norm_b)
+    return dot_product / np.sqrt(np.vdot(vector_a, vector_a) * np.vdot(vector_b, vector_b))
 
 
 class VectorDatabase:
     def __init__(self, embedding_model: EmbeddingModel = None):
-        self.vectors = defaultdict(np.array)
+        self.vectors: Dict[str, np.ndarray] = {}
         self.embedding_model = embedding_model or EmbeddingModel()
+        # Stacked copy of ``vectors`` for cosine search, rebuilt after inserts
+        self._matrix: Optional[np.ndarray] = None
+        self._norms: Optional[np.ndarray] = None
+        self._keys: List[str] = []
 
     def insert(self, key: str, vector: np.array) -> None:
-        self.vectors[key] = vector
+        self.vectors[key] = np.asarray(vector, dtype=np.float32)
+        self._matrix = None
 
     def search(
         self,
@@ -27,11 +29,29 @@ class VectorDatabase:
         k: int,
         distance_measure: Callable = cosine_similarity,
     ) -> List[Tuple[str, float]]:
-        scores = [
-            (key, distance_measure(query_vector, vector))
-            for key, vector in self.vectors.items()
-        ]
-        return sorted(scores, key=lambda x: x[1], reverse=True)[:k]
+        if distance_measure is not cosine_similarity:
+            scores = [
+                (key, distance_measure(query_vector, vector))
+                for key, vector in self.vectors.items()
+            ]
+            return sorted(scores, key=lambda x: x[1], reverse=True)[:k]
+
+        if not self.vectors:
+            return []
+        if self._matrix is None:
+            self._keys = list(self.vectors)
+            self._matrix = np.stack(list(self.vectors.values()))
+            self._norms = np.linalg.norm(self._matrix, axis=1)
+
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        scores = (self._matrix @ query_vector) / (
+            self._norms * np.linalg.norm(query_vector)
+        )
+        # Partition out the k best in O(n), then sort only those k
+        k = min(k, len(scores))
+        top_k = np.argpartition(-scores, k - 1)[:k]
+        top_k = top_k[np.argsort(-scores[top_k], kind="stable")]
+        return [(self._keys[i], float(scores[i])) for i in top_k]
 
     def search_by_text(
         self,
@@ -50,7 +70,7 @@ class VectorDatabase:
     async def abuild_from_list(self, list_of_text: List[str]) -> "VectorDatabase":
         embeddings = await self.embedding_model.async_get_embeddings(list_of_text)
         for text, embedding in zip(list_of_text, embeddings):
-            self.insert(text, np.array(embedding))
+            self.insert(text, np.asarray(embedding, dtype=np.float32))
         return self
 
 
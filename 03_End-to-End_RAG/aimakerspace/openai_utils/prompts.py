@@ -1,5 +1,5 @@
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class BasePrompt:
@@ -8,18 +8,27 @@ class BasePrompt:
     def __init__(self, prompt: str):
         self.prompt = prompt
         self._pattern = re.compile(r"\{([^}]+)\}")
+        self._parsed_prompt: Optional[str] = None
+        self._variables: Tuple[str, ...] = ()
 
     def format_prompt(self, **kwargs: Any) -> str:
         """Return the prompt with ``kwargs`` substituted for placeholders."""
 
-        matches = self._pattern.findall(self.prompt)
-        replacements = {match: kwargs.get(match, "") for match in matches}
+        replacements = {name: kwargs.get(name, "") for name in self._input_variables()}
         return self.prompt.format(**replacements)
 
     def get_input_variables(self) -> List[str]:
         """Return the placeholder names used by this prompt."""
 
-        return self._pattern.findall(self.prompt)
+        return list(self._input_variables())
+
+    def _input_variables(self) -> Tuple[str, ...]:
+        # Scan the template once rather than on every format; rescan only if
+        # ``self.prompt`` has been reassigned
+        if self._parsed_prompt is not self.prompt:
+            self._variables = tuple(self._pattern.findall(self.prompt))
+            self._parsed_prompt = self.prompt
+        return self._variables
 
 
 class RolePrompt(BasePrompt):
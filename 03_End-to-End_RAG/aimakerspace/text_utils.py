@@ -1,7 +1,35 @@
+import importlib.util
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-import PyPDF2
+
+def _find_files(directory: Path, suffix: str) -> List[Path]:
+    """Return files under ``directory`` ending in ``suffix``, sorted by path.
+
+    Uses ``os.scandir`` so file/directory checks come from the cached entry
+    type instead of an extra ``stat`` per path.
+    """
+
+    matches: List[str] = []
+    pending = [os.fspath(directory)]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except PermissionError:
+            # Skip unreadable directories, as ``Path.rglob`` does
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file() and entry.name.lower().endswith(suffix):
+                    matches.append(entry.path)
+    return sorted(Path(match) for match in matches)
 
 
 class TextFileLoader:
@@ -44,9 +72,8 @@ class TextFileLoader:
             )
 
     def _iter_directory(self, directory: Path) -> Iterable[str]:
-        for entry in sorted(directory.rglob("*.txt")):
-            if entry.is_file():
-                yield self._read_text_file(entry)
+        for entry in _find_files(directory, ".txt"):
+            yield self._read_text_file(entry)
 
     def _read_text_file(self, file_path: Path) -> str:
         with file_path.open("r", encoding=self.encoding) as file_handle:
@@ -73,22 +100,164 @@ class CharacterTextSplitter:
         step = self.chunk_size - self.chunk_overlap
         return [text[i : i + self.chunk_size] for i in range(0, len(text), step)]
 
+    def split_bytes(self, data: bytes) -> List[memoryview]:
+        """Split ``data`` into zero-copy ``memoryview`` chunks.
+
+        Offsets are in bytes rather than characters, so a multi-byte UTF-8
+        character may straddle two chunks; decode with ``errors="ignore"`` or
+        use :meth:`split` when exact character boundaries matter.
+        """
+
+        view = memoryview(data)
+        step = self.chunk_size - self.chunk_overlap
+        return [view[i : i + self.chunk_size] for i in range(0, len(view), step)]
+
+    def split_stream(
+        self, pieces: Iterable[str], separator: str = "\n"
+    ) -> Iterator[str]:
+        """Lazily split a stream of text pieces, e.g. PDF pages.
+
+        Yields the same chunks as ``split(separator.join(pieces))`` while only
+        buffering about one chunk plus the current piece.
+        """
+
+        step = self.chunk_size - self.chunk_overlap
+        buffer = None
+        for piece in pieces:
+            buffer = piece if buffer is None else buffer + separator + piece
+            start = 0
+            while len(buffer) - start >= self.chunk_size:
+                yield buffer[start : start + self.chunk_size]
+                start += step
+            buffer = buffer[start:]
+
+        if buffer:
+            for i in range(0, len(buffer), step):
+                yield buffer[i : i + self.chunk_size]
+
     def split_texts(self, texts: List[str]) -> List[str]:
         """Split multiple texts and flatten the resulting chunks."""
 
-        chunks: List[str] = []
-        for text in texts:
-            chunks.extend(self.split(text))
-        return chunks
+        return list(chain.from_iterable(self.split(text) for text in texts))
+
+
+_PDFSource = Union[Path, bytes]
+
+
+def _iter_pymupdf_pages(source: _PDFSource) -> Iterator[str]:
+    import pymupdf
+
+    if isinstance(source, bytes):
+        document = pymupdf.open(stream=source, filetype="pdf")
+    else:
+        document = pymupdf.open(source)
+    with document:
+        for page in document:
+            yield page.get_text()
+
+
+def _iter_pypdf2_pages(source: _PDFSource) -> Iterator[str]:
+    import PyPDF2
+
+    file_handle = io.BytesIO(source) if isinstance(source, bytes) else source.open("rb")
+    with file_handle:
+        for page in PyPDF2.PdfReader(file_handle).pages:
+            yield page.extract_text() or ""
+
+
+def _iter_pages(source: _PDFSource, method: str) -> Iterator[str]:
+    if method == "pymupdf":
+        return _iter_pymupdf_pages(source)
+    return _iter_pypdf2_pages(source)
+
+
+def _extract_pymupdf_pages(file_path: Path, start: int, stop: int) -> List[str]:
+    """Extract pages ``[start, stop)``, opening a fresh document in the worker."""
+
+    import pymupdf
+
+    with pymupdf.open(file_path) as document:
+        return [page.get_text() for page in document.pages(start, stop)]
+
+
+def _extract_worker(file_path: Path, method: str) -> str:
+    """Extract a single PDF; module level so it can run in a worker process."""
+
+    return "\n".join(_iter_pages(file_path, method))
+
+
+def _map_in_processes(
+    function: Callable[..., Any], max_workers: int, *iterables: Iterable[Any]
+) -> Optional[List[Any]]:
+    """Map ``function`` over ``iterables`` in a process pool.
+
+    Returns ``None`` when the runtime cannot run a process pool (e.g. AWS
+    Lambda has no ``/dev/shm`` for its semaphores) or the workers die on
+    startup (e.g. a ``spawn``-started worker re-running an unguarded script),
+    so callers can fall back to extracting serially.
+    """
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(function, *iterables))
+    except (OSError, NotImplementedError, BrokenExecutor):
+        return None
 
 
 class PDFLoader:
-    """Extract text from PDF files stored at a path."""
+    """Extract text from PDF files stored at a path.
+
+    ``method`` selects the extraction backend: ``"pymupdf"`` (by far the
+    fastest) or ``"pypdf2"``. It defaults to ``"pymupdf"`` when PyMuPDF is
+    installed and to ``"pypdf2"`` otherwise. When ``parallel`` is ``True``,
+    directories containing several PDFs are extracted in a process pool, and
+    large single PDFs read with PyMuPDF are split into page blocks that are
+    extracted concurrently.
 
-    def __init__(self, path: str):
+    Extracted text is cached per process, keyed by resolved path, size,
+    modification time and backend, so reloading an unchanged PDF skips
+    opening and parsing it again.
+    """
+
+    METHODS = ("pymupdf", "pypdf2")
+    MAX_WORKERS = 8
+    PAGE_BLOCK_SIZE = 10
+    PARALLEL_PAGE_THRESHOLD = 20
+    TEXT_CACHE_SIZE = 16
+
+    _text_cache: "OrderedDict[Tuple[Path, int, int, str], str]" = OrderedDict()
+
+    def __init__(self, path: str, method: Optional[str] = None, parallel: bool = True):
         self.path = Path(path)
+        self.method = self._resolve_method(method)
+        self.parallel = parallel
         self.documents: List[str] = []
 
+    @classmethod
+    def extract_bytes(cls, data: bytes, method: Optional[str] = None) -> str:
+        """Extract the text of an in-memory PDF, e.g. an uploaded file.
+
+        The backends read straight from ``data``, so there is no need to
+        write it to a temporary file first.
+        """
+
+        method = cls._resolve_method(method)
+        return "\n".join(_iter_pages(bytes(data), method))
+
+    @classmethod
+    def _resolve_method(cls, method: Optional[str]) -> str:
+        if method is None:
+            # Prefer PyMuPDF without making it a hard requirement
+            if importlib.util.find_spec("pymupdf") is not None:
+                return "pymupdf"
+            return "pypdf2"
+        if method not in cls.METHODS:
+            raise ValueError(
+                f"Unknown PDF extraction method {method!r}; "
+                f"expected one of {cls.METHODS}"
+            )
+        return method
+
     def load(self) -> None:
         """Populate ``self.documents`` from the configured path."""
 
@@ -110,6 +279,26 @@ class PDFLoader:
         self.load()
         return self.documents
 
+    def iter_pages(self) -> Iterator[str]:
+        """Yield extracted page texts one at a time.
+
+        Pairs with :meth:`CharacterTextSplitter.split_stream` to chunk a PDF
+        without materializing its full text. For a directory, the pages of
+        each PDF are yielded in path order.
+        """
+
+        if self.path.is_dir():
+            pdf_paths = _find_files(self.path, ".pdf")
+        elif self.path.is_file() and self.path.suffix.lower() == ".pdf":
+            pdf_paths = [self.path]
+        else:
+            raise ValueError(
+                "Provided path must be a directory or a .pdf file: " f"{self.path}"
+            )
+
+        for pdf_path in pdf_paths:
+            yield from _iter_pages(pdf_path, self.method)
+
     def _iter_documents(self) -> Iterable[str]:
         if self.path.is_dir():
             yield from self._iter_directory(self.path)
@@ -121,15 +310,77 @@ class PDFLoader:
             )
 
     def _iter_directory(self, directory: Path) -> Iterable[str]:
-        for entry in sorted(directory.rglob("*.pdf")):
-            if entry.is_file():
+        pdf_paths = _find_files(directory, ".pdf")
+        pending = [entry for entry in pdf_paths if self._cached_text(entry) is None]
+        max_workers = min(os.cpu_count() or 1, self.MAX_WORKERS, len(pending))
+
+        extracted: Dict[Path, str] = {}
+        if self.parallel and max_workers >= 2:
+            texts = _map_in_processes(
+                _extract_worker, max_workers, pending, [self.method] * len(pending)
+            )
+            if texts is not None:
+                extracted = dict(zip(pending, texts))
+
+        for entry in pdf_paths:
+            text = extracted.get(entry)
+            if text is None:
                 yield self._read_pdf(entry)
+            else:
+                self._cache_text(entry, text)
+                yield text
 
     def _read_pdf(self, file_path: Path) -> str:
-        with file_path.open("rb") as file_handle:
-            pdf_reader = PyPDF2.PdfReader(file_handle)
-            extracted_pages = [page.extract_text() or "" for page in pdf_reader.pages]
-        return "\n".join(extracted_pages)
+        text = self._cached_text(file_path)
+        if text is None:
+            if self.parallel and self.method == "pymupdf":
+                text = self._extract_pages_parallel(file_path)
+            else:
+                text = _extract_worker(file_path, self.method)
+            self._cache_text(file_path, text)
+        return text
+
+    def _cache_key(self, file_path: Path) -> Tuple[Path, int, int, str]:
+        stat = file_path.stat()
+        return (file_path.resolve(), stat.st_size, stat.st_mtime_ns, self.method)
+
+    def _cached_text(self, file_path: Path) -> Optional[str]:
+        key = self._cache_key(file_path)
+        text = self._text_cache.get(key)
+        if text is not None:
+            self._text_cache.move_to_end(key)
+        return text
+
+    def _cache_text(self, file_path: Path, text: str) -> None:
+        self._text_cache[self._cache_key(file_path)] = text
+        while len(self._text_cache) > self.TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+
+    def _extract_pages_parallel(self, file_path: Path) -> str:
+        cpu_count = os.cpu_count() or 1
+        if cpu_count < 2:
+            return _extract_worker(file_path, "pymupdf")
+
+        import pymupdf
+
+        with pymupdf.open(file_path) as document:
+            page_count = document.page_count
+        if page_count < self.PARALLEL_PAGE_THRESHOLD:
+            return _extract_worker(file_path, "pymupdf")
+
+        starts = list(range(0, page_count, self.PAGE_BLOCK_SIZE))
+        stops = [min(start + self.PAGE_BLOCK_SIZE, page_count) for start in starts]
+        max_workers = min(cpu_count, self.MAX_WORKERS, len(starts))
+        page_blocks = _map_in_processes(
+            _extract_pymupdf_pages,
+            max_workers,
+            [file_path] * len(starts),
+            starts,
+            stops,
+        )
+        if page_blocks is None:
+            return _extract_worker(file_path, "pymupdf")
+        return "\n".join(text for block in page_blocks for text in block)
 
 
 if __name__ == "__main__":
@@ -1,34 +1,136 @@
 import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from itertools import islice
 from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
 from aimakerspace.openai_utils.embedding import EmbeddingModel
 
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
 
 def cosine_similarity(vector_a: np.ndarray, vector_b: np.ndarray) -> float:
     """Return the cosine similarity between two vectors."""
 
-    norm_a = np.linalg.norm(vector_a)
-    norm_b = np.linalg.norm(vector_b)
-    if norm_a == 0 or norm_b == 0:
+    squared_norms = np.vdot(vector_a, vector_a) * np.vdot(vector_b, vector_b)
+    if squared_norms == 0:
         return 0.0
 
     dot_product = np.dot(vector_a, vector_b)
-    return float(dot_product / (norm_a * norm_b))
+    return float(dot_product / np.sqrt(squared_norms))
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the ``k`` highest ``scores``, best first.
+
+    ``np.argpartition`` selects the candidates in O(n); only those ``k`` are
+    then sorted.
+    """
+
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    top_k = np.argpartition(-scores, k - 1)[:k]
+    return top_k[np.argsort(-scores[top_k], kind="stable")]
 
 
 class VectorDatabase:
     """Minimal in-memory vector store backed by numpy arrays."""
 
-    def __init__(self, embedding_model: Optional[EmbeddingModel] = None):
+    QUERY_CACHE_SIZE = 32
+    QUERY_EMBEDDING_CACHE_SIZE = 256
+    ANN_M = 16
+    ANN_EF_CONSTRUCTION = 200
+    ANN_EF_SEARCH = 64
+
+    def __init__(
+        self,
+        embedding_model: Optional[EmbeddingModel] = None,
+        normalize: bool = True,
+        embedding_cache_path: Optional[str] = None,
+        query_cache_threshold: Optional[float] = None,
+        use_ann: bool = False,
+    ):
+        """Create an empty store.
+
+        Vectors are stored as float32. With ``normalize=True`` (the default)
+        they are also scaled to unit length on insert, so cosine similarity
+        reduces to a plain dot product. Custom ``distance_measure`` callables
+        therefore receive float32 (and, when normalizing, unit) vectors.
+
+        When ``embedding_cache_path`` is given, embeddings computed by
+        ``abuild_from_list`` are persisted to that ``.npz`` file and reused by
+        later builds with the same embedding model.
+
+        When ``query_cache_threshold`` is given, ``search_by_text`` reuses the
+        results of a recent query whose embedding has at least that cosine
+        similarity to the new one (e.g. ``0.95``). The cache is cleared on
+        every insert.
+
+        With ``use_ann=True`` cosine searches go through an approximate HNSW
+        index (requires ``hnswlib``), built lazily on the first search after
+        an insert. Results may then differ slightly from an exact scan.
+        """
+
+        if use_ann and hnswlib is None:
+            raise ImportError(
+                "use_ann=True requires hnswlib; install it with `pip install hnswlib`"
+            )
+
         self.vectors: Dict[str, np.ndarray] = {}
         self.embedding_model = embedding_model or EmbeddingModel()
+        self.normalize = normalize
+        self._matrix: Optional[np.ndarray] = None
+        self._inv_norms: Dict[str, float] = {}
+        self._inv_norms_array: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+        self._dirty = True
+        self.embedding_cache_path = embedding_cache_path
+        self._embedding_cache: Optional[Dict[bytes, np.ndarray]] = None
+        self._embedding_cache_changed = False
+        self.query_cache_threshold = query_cache_threshold
+        self._query_cache: List[Tuple[np.ndarray, tuple, list]] = []
+        self.use_ann = use_ann
+        self._ann_index = None
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
 
     def insert(self, key: str, vector: Iterable[float]) -> None:
         """Store ``vector`` so that it can be retrieved with ``key`` later on."""
 
-        self.vectors[key] = np.asarray(vector, dtype=float)
+        if self.normalize:
+            unit_vector = np.array(vector, dtype=np.float32)
+            unit_vector /= np.linalg.norm(unit_vector) + 1e-12
+            self.vectors[key] = unit_vector
+        else:
+            vector = np.ascontiguousarray(vector, dtype=np.float32)
+            self.vectors[key] = vector
+            self._inv_norms[key] = 1.0 / (float(np.linalg.norm(vector)) + 1e-12)
+        self._dirty = True
+        self._query_cache.clear()
+        self._ann_index = None
+
+    def bulk_insert(
+        self, keys: Iterable[str], vectors: Iterable[Iterable[float]]
+    ) -> None:
+        """Store many vectors at once; ``vectors`` is an ``(n, d)`` array-like."""
+
+        keys = list(keys)
+        matrix = np.array(vectors, dtype=np.float32)
+        if matrix.ndim == 1 and matrix.size:
+            # A single flat vector is one row
+            matrix = matrix[np.newaxis, :]
+        if len(keys) != len(matrix):
+            raise ValueError(
+                f"Got {len(keys)} keys for {len(matrix)} vectors; counts must match"
+            )
+        if keys:
+            self._insert_matrix(keys, matrix)
 
     def search(
         self,
@@ -38,16 +140,8 @@ class VectorDatabase:
     ) -> List[Tuple[str, float]]:
         """Return the ``k`` vectors most similar to ``query_vector``."""
 
-        if k <= 0:
-            raise ValueError("k must be a positive integer")
-
-        query = np.asarray(query_vector, dtype=float)
-        scores = [
-            (key, distance_measure(query, vector))
-            for key, vector in self.vectors.items()
-        ]
-        scores.sort(key=lambda item: item[1], reverse=True)
-        return scores[:k]
+        keys, scores, top_k = self._rank(query_vector, k, distance_measure)
+        return [(keys[i], float(scores[i])) for i in top_k]
 
     def search_by_text(
         self,
@@ -58,25 +152,338 @@ class VectorDatabase:
     ) -> Union[List[Tuple[str, float]], List[str]]:
         """Vector search using an embedding generated from ``query_text``."""
 
-        query_vector = self.embedding_model.get_embedding(query_text)
-        results = self.search(query_vector, k, distance_measure)
+        query_vector = self._embed_query(query_text)
+        if self.query_cache_threshold is None:
+            return self._search_vector(
+                query_vector, k, distance_measure, return_as_text
+            )
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        unit_query = query / (np.linalg.norm(query) + 1e-12)
+        signature = (k, distance_measure, return_as_text)
+        for i, (cached_query, cached_signature, results) in enumerate(
+            self._query_cache
+        ):
+            if (
+                cached_signature == signature
+                and float(cached_query @ unit_query) >= self.query_cache_threshold
+            ):
+                self._query_cache.append(self._query_cache.pop(i))
+                return list(results)
+
+        results = self._search_vector(query, k, distance_measure, return_as_text)
+        self._query_cache.append((unit_query, signature, results))
+        if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+            self._query_cache.pop(0)
+        return list(results)
+
+    def _embed_query(self, query_text: str) -> np.ndarray:
+        """Embed ``query_text``, reusing the result for repeated queries."""
+
+        query_vector = self._query_embeddings.get(query_text)
+        if query_vector is not None:
+            self._query_embeddings.move_to_end(query_text)
+            return query_vector
+
+        query_vector = np.asarray(
+            self.embedding_model.get_embedding(query_text), dtype=np.float32
+        )
+        self._query_embeddings[query_text] = query_vector
+        if len(self._query_embeddings) > self.QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_embeddings.popitem(last=False)
+        return query_vector
+
+    def _search_vector(
+        self,
+        query_vector: Iterable[float],
+        k: int,
+        distance_measure: Callable[[np.ndarray, np.ndarray], float],
+        return_as_text: bool,
+    ) -> Union[List[Tuple[str, float]], List[str]]:
         if return_as_text:
-            return [result[0] for result in results]
-        return results
+            return self._search_keys_only(query_vector, k, distance_measure)
+        return self.search(query_vector, k, distance_measure)
 
     def retrieve_from_key(self, key: str) -> Optional[np.ndarray]:
         """Return the stored vector for ``key`` if present."""
 
         return self.vectors.get(key)
 
-    async def abuild_from_list(self, list_of_text: List[str]) -> "VectorDatabase":
-        """Populate the vector store asynchronously from raw text snippets."""
+    def _search_keys_only(
+        self,
+        query_vector: Iterable[float],
+        k: int,
+        distance_measure: Callable[[np.ndarray, np.ndarray], float],
+    ) -> List[str]:
+        """Like :meth:`search` but return only the matching keys."""
+
+        keys, _, top_k = self._rank(query_vector, k, distance_measure)
+        return [keys[i] for i in top_k]
+
+    def _rank(
+        self,
+        query_vector: Iterable[float],
+        k: int,
+        distance_measure: Callable[[np.ndarray, np.ndarray], float],
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Score every stored vector and select the indices of the best ``k``."""
+
+        if k <= 0:
+            raise ValueError("k must be a positive integer")
+
+        query = np.asarray(query_vector, dtype=float)
+        if distance_measure is cosine_similarity and self.use_ann:
+            return self._ann_rank(query, k)
+        if distance_measure is cosine_similarity:
+            keys, scores = self._cosine_scores(query)
+        else:
+            keys = list(self.vectors)
+            scores = np.fromiter(
+                (distance_measure(query, vector) for vector in self.vectors.values()),
+                dtype=float,
+                count=len(keys),
+            )
+        return keys, scores, _top_k_indices(scores, k)
+
+    def _cosine_scores(self, query: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """Score ``query`` against every stored vector with one matrix product."""
+
+        self._ensure_matrix()
+        if not self._keys:
+            return self._keys, np.empty(0, dtype=np.float32)
+
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return self._keys, np.zeros(len(self._keys), dtype=np.float32)
+        if self.normalize:
+            query = (query / query_norm).astype(np.float32)
+            return self._keys, self._matrix @ query
+
+        similarities = self._matrix @ query.astype(np.float32)
+        return self._keys, similarities * self._inv_norms_array * (1.0 / query_norm)
+
+    def _ann_rank(
+        self, query: np.ndarray, k: int
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Approximate ``_rank`` for cosine similarity using the HNSW index.
+
+        The returned keys and scores cover only the ``k`` neighbours found,
+        already in best-first order.
+        """
+
+        self._ensure_matrix()
+        k = min(k, len(self._keys))
+        if k == 0 or not np.any(query):
+            keys, scores = self._cosine_scores(query)
+            return keys, scores, _top_k_indices(scores, k)
+
+        if self._ann_index is None:
+            index = hnswlib.Index(space="cosine", dim=self._matrix.shape[1])
+            index.init_index(
+                max_elements=len(self._keys),
+                ef_construction=self.ANN_EF_CONSTRUCTION,
+                M=self.ANN_M,
+            )
+            index.add_items(self._matrix, np.arange(len(self._keys)))
+            self._ann_index = index
+
+        self._ann_index.set_ef(max(self.ANN_EF_SEARCH, k))
+        labels, distances = self._ann_index.knn_query(query.astype(np.float32), k=k)
+        keys = [self._keys[i] for i in labels[0]]
+        return keys, 1.0 - distances[0], np.arange(k)
+
+    def _ensure_matrix(self) -> None:
+        """Rebuild the stacked ``(n, d)`` matrix used by the cosine fast path."""
+
+        if not self._dirty:
+            return
+
+        self._keys = list(self.vectors)
+        self._matrix = np.stack(list(self.vectors.values())) if self._keys else None
+        self._inv_norms_array = None
+        if self._keys and not self.normalize:
+            self._inv_norms_array = np.array(
+                [self._inv_norms[key] for key in self._keys], dtype=np.float32
+            )
+        self._dirty = False
+
+    async def abuild_from_list(
+        self, list_of_text: List[str], batch_size: int = 512
+    ) -> "VectorDatabase":
+        """Populate the vector store asynchronously from raw text snippets.
+
+        Texts are embedded in concurrent requests of ``batch_size`` items.
+        Since texts double as keys, repeated texts and texts already in the
+        store are embedded only once.
+        """
+
+        new_texts = [
+            text for text in dict.fromkeys(list_of_text) if text not in self.vectors
+        ]
+        if not new_texts:
+            return self
+
+        matrix = await self._aembed_new(new_texts, batch_size)
+        self._insert_matrix(new_texts, matrix)
+        return self
+
+    async def abuild_from_iterable(
+        self, texts: Iterable[str], batch_size: int = 512
+    ) -> "VectorDatabase":
+        """Populate the vector store from a lazily produced stream of texts.
+
+        Batches of ``batch_size`` texts are pulled from ``texts`` in a worker
+        thread and sent off for embedding right away, so producing the stream
+        (e.g. ``PDFLoader.iter_pages`` fed through
+        ``CharacterTextSplitter.split_stream``) overlaps the embedding
+        requests instead of finishing before the first one starts.
+        """
 
-        embeddings = await self.embedding_model.async_get_embeddings(list_of_text)
-        for text, embedding in zip(list_of_text, embeddings):
-            self.insert(text, embedding)
+        iterator = iter(texts)
+        seen = set(self.vectors)
+        new_texts: List[str] = []
+        pending = []
+        while True:
+            batch = await asyncio.to_thread(list, islice(iterator, batch_size))
+            if not batch:
+                break
+            batch = [text for text in dict.fromkeys(batch) if text not in seen]
+            if batch:
+                seen.update(batch)
+                new_texts.extend(batch)
+                pending.append(
+                    asyncio.create_task(
+                        self._aembed_new(batch, batch_size, save_cache=False)
+                    )
+                )
+
+        if pending:
+            matrices = await asyncio.gather(*pending)
+            # Batches only update the in-memory cache; write the file once
+            if self.embedding_cache_path is not None:
+                self._save_embedding_cache(self._load_embedding_cache())
+            self._insert_matrix(new_texts, np.concatenate(matrices))
         return self
 
+    async def _aembed_new(
+        self, texts: List[str], batch_size: int, save_cache: bool = True
+    ) -> np.ndarray:
+        if self.embedding_cache_path is None:
+            return await self._aembed_matrix(texts, batch_size)
+        return await self._aembed_matrix_cached(texts, batch_size, save_cache)
+
+    async def _aembed_matrix(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Embed ``texts`` batch-wise into a preallocated float32 matrix.
+
+        Each batch is copied into its row range as soon as it arrives, so the
+        conversion work overlaps the requests still in flight.
+        """
+
+        async def embed_batch(start: int) -> Tuple[int, List[List[float]]]:
+            batch = texts[start : start + batch_size]
+            return start, await self.embedding_model.async_get_embeddings(batch)
+
+        batches = [embed_batch(start) for start in range(0, len(texts), batch_size)]
+        matrix: Optional[np.ndarray] = None
+        for next_batch in asyncio.as_completed(batches):
+            start, embeddings = await next_batch
+            rows = np.asarray(embeddings, dtype=np.float32)
+            if matrix is None:
+                matrix = np.empty((len(texts), rows.shape[1]), dtype=np.float32)
+            matrix[start : start + len(rows)] = rows
+        return matrix
+
+    async def _aembed_matrix_cached(
+        self, texts: List[str], batch_size: int, save_cache: bool = True
+    ) -> np.ndarray:
+        """Like ``_aembed_matrix``, but reuse embeddings from the on-disk cache.
+
+        Only texts missing from the cache are sent to the embedding model; the
+        cache file is rewritten when any were added, unless ``save_cache`` is
+        false and the caller saves once after several calls.
+        """
+
+        cache = self._load_embedding_cache()
+        digests = [
+            hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+            for text in texts
+        ]
+        missing = [i for i, digest in enumerate(digests) if digest not in cache]
+        if missing:
+            fresh = await self._aembed_matrix([texts[i] for i in missing], batch_size)
+            cache.update((digests[i], row) for i, row in zip(missing, fresh))
+            self._embedding_cache_changed = True
+            if save_cache:
+                self._save_embedding_cache(cache)
+        # np.stack copies, so normalizing the result leaves the cache intact
+        return np.stack([cache[digest] for digest in digests])
+
+    def _load_embedding_cache(self) -> Dict[bytes, np.ndarray]:
+        if self._embedding_cache is None:
+            self._embedding_cache = {}
+            if os.path.exists(self.embedding_cache_path):
+                with np.load(self.embedding_cache_path) as data:
+                    digests = data["digests"]
+                    # Digests are stored as (n, 16) uint8 rows: NumPy's fixed-width
+                    # bytes dtype would strip trailing zero bytes on read
+                    if (
+                        str(data["model"]) == self._embedding_model_name()
+                        and digests.dtype == np.uint8
+                    ):
+                        self._embedding_cache = {
+                            digest.tobytes(): vector
+                            for digest, vector in zip(digests, data["vectors"])
+                        }
+        return self._embedding_cache
+
+    def _save_embedding_cache(self, cache: Dict[bytes, np.ndarray]) -> None:
+        if not self._embedding_cache_changed:
+            return
+        # Write to a temporary file first so an interrupted run cannot leave a
+        # truncated cache behind
+        tmp_path = f"{self.embedding_cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                model=np.array(self._embedding_model_name()),
+                digests=np.frombuffer(b"".join(cache), dtype=np.uint8).reshape(
+                    len(cache), 16
+                ),
+                vectors=np.stack(list(cache.values())),
+            )
+        os.replace(tmp_path, self.embedding_cache_path)
+        self._embedding_cache_changed = False
+
+    def _embedding_model_name(self) -> str:
+        return getattr(self.embedding_model, "embeddings_model_name", "")
+
+    def _insert_matrix(self, keys: List[str], matrix: np.ndarray) -> None:
+        """Insert the rows of a float32 ``(n, d)`` matrix under ``keys``.
+
+        Rows are stored as views into ``matrix`` (normalized in place when
+        ``self.normalize`` is set). When the store was empty and the keys are
+        unique, ``matrix`` also becomes the search matrix, so no rebuild is
+        needed.
+        """
+
+        self._query_cache.clear()
+        self._ann_index = None
+        inv_norms = 1.0 / (np.linalg.norm(matrix, axis=1) + 1e-12)
+        if self.normalize:
+            matrix *= inv_norms[:, np.newaxis]
+        else:
+            self._inv_norms.update(zip(keys, inv_norms.tolist()))
+
+        was_empty = not self.vectors
+        self.vectors.update(zip(keys, matrix))
+        if was_empty and len(self.vectors) == len(keys):
+            self._keys = list(keys)
+            self._matrix = matrix
+            self._inv_norms_array = None if self.normalize else inv_norms
+            self._dirty = False
+        else:
+            self._dirty = True
+
 
 if __name__ == "__main__":
     list_of_text = [